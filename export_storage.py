@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Back up every object in S3 storage into storage_backup.zip.
+
+Mirrors the connection setup in server/object-storage.ts: reads S3_ENDPOINT,
+S3_REGION, S3_ACCESS_KEY, S3_SECRET_KEY and S3_BUCKET from the environment
+and only considers keys under the SOHO/ prefix.
+
+Requires boto3 (pip install boto3). Run with the server's .env loaded:
+    set -a; . ./.env; set +a; python3 export_storage.py
+"""
+import os
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import boto3
+
+# ISA-L's SIMD-accelerated DEFLATE is several times faster than stock zlib
+# at comparable ratios; fall back to the stdlib when it is not installed
+# (pip install isal).
+try:
+    from isal import isal_zlib as _zlib_impl
+    _DEFAULT_LEVEL = 3  # isal levels run 0-3; 3 is its best ratio
+    _LEVEL_RANGE = (0, 3)
+except ImportError:
+    _zlib_impl = zlib
+    _DEFAULT_LEVEL = 6
+    _LEVEL_RANGE = (0, 9)
+
+# Same prefix as server/object-storage.ts
+BUCKET_PREFIX = 'SOHO/'
+OUTPUT_ZIP = 'storage_backup.zip'
+# High enough to amortize per-request latency on the many-small-files end
+# of the object-size distribution.
+MAX_WORKERS = 32
+# Objects at least this big are fetched as concurrent byte-range chunks
+# instead of one sequential GET.
+LARGE_OBJECT_THRESHOLD = 32 * 1024 * 1024
+RANGE_CHUNK = 8 * 1024 * 1024
+# Tunable so tiny ad-hoc backups can use a fast level and big nightly
+# runs a thorough one. Clamped to the active backend's range so a
+# zlib-style level (e.g. 6) keeps working if isal shows up on the host.
+ZIP_LEVEL = max(_LEVEL_RANGE[0],
+                min(_LEVEL_RANGE[1],
+                    int(os.environ.get('BACKUP_ZIP_LEVEL', _DEFAULT_LEVEL))))
+
+
+def make_client():
+    endpoint = os.environ.get('S3_ENDPOINT')
+    access_key = os.environ.get('S3_ACCESS_KEY')
+    secret_key = os.environ.get('S3_SECRET_KEY')
+    if not (endpoint and access_key and secret_key and os.environ.get('S3_BUCKET')):
+        print('Missing S3 env vars (need S3_ENDPOINT, S3_ACCESS_KEY, S3_SECRET_KEY, S3_BUCKET)', file=sys.stderr)
+        sys.exit(1)
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint,
+        region_name=os.environ.get('S3_REGION', 'auto'),
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+    )
+
+
+def compress_member(data):
+    """Deflate one zip member, returning (crc, uncompressed size, body).
+
+    Runs inside the worker threads so compression scales with the pool:
+    both isal and zlib release the GIL while deflating. wbits=-15 produces
+    the raw stream a ZIP_DEFLATED member needs.
+    """
+    comp = _zlib_impl.compressobj(ZIP_LEVEL, zlib.DEFLATED, -15)
+    body = comp.compress(data) + comp.flush()
+    return _zlib_impl.crc32(data) & 0xFFFFFFFF, len(data), body
+
+
+def write_precompressed(zf, arcname, crc, file_size, body):
+    """Splice an already-deflated member into an open ZipFile.
+
+    ZipFile has no public API for pre-compressed data, so this writes the
+    local file header and body directly and registers the ZipInfo for the
+    central directory, mirroring what ZipFile.writestr does internally.
+    CRC and sizes are known up front, so no data descriptor is needed.
+    """
+    zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.external_attr = 0o600 << 16
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = len(body)
+    zinfo.header_offset = zf.fp.tell()
+    zip64 = (file_size > zipfile.ZIP64_LIMIT
+             or zinfo.compress_size > zipfile.ZIP64_LIMIT)
+    zf._writecheck(zinfo)
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+    zf.fp.write(body)
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+
+
+def list_objects(client, bucket):
+    objects = []
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=BUCKET_PREFIX):
+        for obj in page.get('Contents', []):
+            objects.append((obj['Key'], obj['Size']))
+    return objects
+
+
+def main():
+    client = make_client()
+    bucket = os.environ['S3_BUCKET']
+
+    objects = list_objects(client, bucket)
+    print(f'Found {len(objects)} objects to back up')
+
+    # The listing already carries sizes, so split the workload: small
+    # objects get one GET each across many workers, large objects are
+    # fetched as parallel byte-range chunks so a single big file can still
+    # use the whole connection pool.
+    small = [key for key, size in objects if size < LARGE_OBJECT_THRESHOLD]
+    large = [(key, size) for key, size in objects if size >= LARGE_OBJECT_THRESHOLD]
+
+    def fetch(key):
+        data = client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        return (key,) + compress_member(data)
+
+    def fetch_range(key, size, start):
+        end = min(start + RANGE_CHUNK, size) - 1
+        resp = client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end}')
+        return resp['Body'].read()
+
+    # Downloads are latency-bound and DEFLATE is CPU-bound, so the workers
+    # do both: each one fetches an object and hands back a ready-made
+    # deflate stream, letting compression scale with the pool while the
+    # main thread only splices members into the archive (ZipFile is not
+    # thread-safe). Iterating the map result re-raises the first worker
+    # exception instead of hiding it. A 1 MiB write buffer coalesces the
+    # header/payload writes into few large syscalls, and the fadvise hint
+    # tells the kernel the file is written sequentially.
+    with open(OUTPUT_ZIP, 'wb', buffering=1 << 20) as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with zipfile.ZipFile(f, 'w') as zf:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+                # Submit small objects through a bounded window and write
+                # members as they finish. ex.map would queue every job up
+                # front and hold completed downloads until the writer
+                # reaches them in submission order, so one slow object
+                # could pile an unbounded number of finished results in
+                # memory; this caps in-flight work at ~2x the pool size.
+                pending = set()
+
+                def drain():
+                    done, rest = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        key, crc, size, body = fut.result()
+                        write_precompressed(zf, key, crc, size, body)
+                        print(f'Archived {key}')
+                    return rest
+
+                for key in small:
+                    pending.add(ex.submit(fetch, key))
+                    if len(pending) >= MAX_WORKERS * 2:
+                        pending = drain()
+                while pending:
+                    pending = drain()
+
+                # One large object at a time keeps peak memory bounded at
+                # roughly one object; its chunks still download in parallel,
+                # then the reassembled blob is compressed here.
+                for key, size in large:
+                    starts = range(0, size, RANGE_CHUNK)
+                    chunks = ex.map(lambda start: fetch_range(key, size, start), starts)
+                    crc, file_size, body = compress_member(b''.join(chunks))
+                    write_precompressed(zf, key, crc, file_size, body)
+                    print(f'Archived {key} ({size} bytes, ranged)')
+
+    print(f'Wrote {OUTPUT_ZIP}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@
 import sys
 import json
 import openpyxl
-from openpyxl.styles import numbers
+from openpyxl.styles import numbers, NamedStyle
 from copy import copy
 
 # Country code mapping: 2-letter → 3-digit numeric code
@@ -33,6 +33,22 @@ DEFAULT_COUNTRY_CODE_MAPPING = {
 }
 
 import os
+import functools
+from io import BytesIO
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'EXCEL_BEYANNAME_AKTARIM.xlsx')
+
+# Per-row stderr prints make the loop I/O-bound under piped stdio;
+# opt back in with BEYANNAME_DEBUG=1 when diagnosing country mappings.
+DEBUG = bool(os.environ.get('BEYANNAME_DEBUG'))
+
+@functools.lru_cache(maxsize=1)
+def _template_bytes():
+    # Cached so warm processes that call the exporter repeatedly skip the
+    # disk read; the __main__ subprocess path pays it once either way.
+    with open(TEMPLATE_PATH, 'rb') as f:
+        return f.read()
+
 def export_beyanname_excel(data):
     """
     Export tax calculation data to BEYANNAME Excel template.
@@ -40,16 +56,20 @@ def export_beyanname_excel(data):
     - Row 1: Headers with column descriptions
     - Row 2+: Product data
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    template_path = os.path.join(script_dir, 'EXCEL_BEYANNAME_AKTARIM.xlsx')
-    
     # Load template
-    wb = openpyxl.load_workbook(template_path)
+    wb = openpyxl.load_workbook(BytesIO(_template_bytes()))
     ws = wb.active
+
+    # One shared text style for the MENŞE column: assigning a per-cell
+    # number_format creates a distinct style record per row that openpyxl
+    # has to dedupe on save, while a NamedStyle is registered once.
+    menshe_style = NamedStyle(name='menshe_text', number_format='@')
+    wb.add_named_style(menshe_style)
     
-    # Merge default mappings with custom mappings
+    # Merge default mappings with custom mappings, normalizing keys to
+    # uppercase once so the per-row lookup is a plain dict hit.
     custom_mappings = data.get('customMappings', {})
-    country_code_mapping = {**DEFAULT_COUNTRY_CODE_MAPPING, **custom_mappings}
+    country_code_mapping = {k.upper(): v for k, v in {**DEFAULT_COUNTRY_CODE_MAPPING, **custom_mappings}.items()}
     
     items = data['items']
     
@@ -81,12 +101,12 @@ def export_beyanname_excel(data):
         # NOT from product_data - this ensures we use the country specified during this calculation
         country_of_origin = item.get('country_of_origin', '')
         
-        # DEBUG: Print country data
-        print(f"[DEBUG] Row {row_num}: country_of_origin='{country_of_origin}' (from tax_calculation_items)", file=sys.stderr)
-        
         # Convert country code from 2-letter to 3-digit numeric
         country_code_3digit = country_code_mapping.get(country_of_origin.upper(), '') if country_of_origin else ''
-        print(f"[DEBUG] Row {row_num}: country_code_3digit='{country_code_3digit}'", file=sys.stderr)
+
+        if DEBUG:
+            print(f"[DEBUG] Row {row_num}: country_of_origin='{country_of_origin}' (from tax_calculation_items)", file=sys.stderr)
+            print(f"[DEBUG] Row {row_num}: country_code_3digit='{country_code_3digit}'", file=sys.stderr)
         
         # Build TANIM (description)
         style = item.get('style', '')
@@ -105,26 +125,25 @@ def export_beyanname_excel(data):
         
         tanim = ' '.join(tanim_parts)
         
-        # Write to columns
-        ws[f'A{row_num}'] = tr_hs_code              # GTİP: TR HS CODE
-        ws[f'B{row_num}'] = total_value              # KIYMET: Invoice value (Cost × Units)
-        
+        # Write to columns by number — the ws[f'A{row}'] form re-parses the
+        # coordinate string with a regex on every write.
+        ws.cell(row_num, 1, tr_hs_code)              # GTİP: TR HS CODE
+        ws.cell(row_num, 2, total_value)             # KIYMET: Invoice value (Cost × Units)
+
         # MENŞE: Country code as TEXT to preserve leading zeros
-        cell_c = ws[f'C{row_num}']
-        cell_c.value = country_code_3digit
-        cell_c.number_format = '@'  # Format as text to preserve leading zeros
-        ws[f'D{row_num}'] = unit                     # MİKTAR CİNS: unit from hs_codes
-        ws[f'E{row_num}'] = '1'                      # KAP ADET: Always "1"
-        ws[f'F{row_num}'] = 'BI'                     # KAP CİNS: Always "BI"
-        ws[f'G{row_num}'] = brand                    # MARKA: brand from products
-        ws[f'H{row_num}'] = unit_count               # ADET: units from invoice
-        ws[f'I{row_num}'] = 'K1'                     # K1: Always "K1"
-        ws[f'J{row_num}'] = '9'                      # SİP TÜRÜ: Always "9"
-        ws[f'K{row_num}'] = ''                       # ATR DİĞER: Leave empty
-        ws[f'L{row_num}'] = '11'                     # İŞL. NİT: Always "11"
-        ws[f'M{row_num}'] = tanim                    # TANIM: Concatenated description
-        ws[f'N{row_num}'] = vat_percent              # KDV: vat_percent as percentage
-        ws[f'O{row_num}'] = '-'                      # NO: Always "-"
+        ws.cell(row_num, 3, country_code_3digit).style = 'menshe_text'
+        ws.cell(row_num, 4, unit)                    # MİKTAR CİNS: unit from hs_codes
+        ws.cell(row_num, 5, '1')                     # KAP ADET: Always "1"
+        ws.cell(row_num, 6, 'BI')                    # KAP CİNS: Always "BI"
+        ws.cell(row_num, 7, brand)                   # MARKA: brand from products
+        ws.cell(row_num, 8, unit_count)              # ADET: units from invoice
+        ws.cell(row_num, 9, 'K1')                    # K1: Always "K1"
+        ws.cell(row_num, 10, '9')                    # SİP TÜRÜ: Always "9"
+        ws.cell(row_num, 11, '')                     # ATR DİĞER: Leave empty
+        ws.cell(row_num, 12, '11')                   # İŞL. NİT: Always "11"
+        ws.cell(row_num, 13, tanim)                  # TANIM: Concatenated description
+        ws.cell(row_num, 14, vat_percent)            # KDV: vat_percent as percentage
+        ws.cell(row_num, 15, '-')                    # NO: Always "-"
     
     # Save output
     calc = data['calculation']
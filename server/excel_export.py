@@ -7,45 +7,68 @@ from openpyxl.styles import PatternFill, Border, Side
 from openpyxl.styles.differential import DifferentialStyle
 from openpyxl.formatting.rule import Rule
 
-def set_cell_value(ws, cell_ref, value):
-    from openpyxl.utils import coordinate_to_tuple
-    
-    row, col = coordinate_to_tuple(cell_ref)
-    
-    for merged_range in ws.merged_cells.ranges:
-        if cell_ref in merged_range:
-            top_left = merged_range.start_cell
-            ws[top_left.coordinate].value = value
-            return
-    
+def build_merge_map(ws):
+    """Map every (row, col) inside a merged range to the range's top-left.
+
+    Lets set_cell_value resolve merged targets with one dict hit instead of
+    scanning ws.merged_cells.ranges on every write.
+    """
+    merge_map = {}
+    for mr in ws.merged_cells.ranges:
+        top_left = (mr.min_row, mr.min_col)
+        for r in range(mr.min_row, mr.max_row + 1):
+            for c in range(mr.min_col, mr.max_col + 1):
+                merge_map[(r, c)] = top_left
+    return merge_map
+
+def set_cell(ws, row, col, value, merge_map):
+    target = merge_map.get((row, col), (row, col))
     try:
-        ws[cell_ref].value = value
+        ws.cell(*target).value = value
     except AttributeError:
         pass
+
+def set_cell_value(ws, cell_ref, value, merge_map=None):
+    from openpyxl.utils import coordinate_to_tuple
+
+    row, col = coordinate_to_tuple(cell_ref)
+
+    if merge_map is None:
+        merge_map = build_merge_map(ws)
+
+    set_cell(ws, row, col, value, merge_map)
     
 import os
+import functools
+from io import BytesIO
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'excel_export_template_1.xlsx')
+
+SPECIAL_CUSTOM_TOKENS = frozenset({'SPECIAL CUSTOM', 'SPECIAL CUSTOMS'})
+
+@functools.lru_cache(maxsize=1)
+def _template_bytes():
+    # Cached so warm processes that call export_excel repeatedly skip the
+    # disk read; the __main__ subprocess path pays it once either way.
+    with open(TEMPLATE_PATH, 'rb') as f:
+        return f.read()
+
 def export_excel(data):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    template_path = os.path.join(script_dir, 'excel_export_template_1.xlsx')
-    
-    wb_data_only = openpyxl.load_workbook(template_path, data_only=True)
-    ws_data = wb_data_only.active
-    
-    wb = openpyxl.load_workbook(template_path, keep_links=False)
+    # A single load is enough: every formula cell in the template is either
+    # overwritten with computed values below or cleared by the padding
+    # scrub, so the second data_only load (a full extra XLSX parse) that
+    # used to replace formulas with their cached values bought nothing.
+    wb = openpyxl.load_workbook(BytesIO(_template_bytes()), keep_links=False)
     ws = wb.active
-    
-    for row in ws.iter_rows():
-        for cell in row:
-            if cell.data_type == 'f':
-                value_cell = ws_data[cell.coordinate]
-                cell.value = value_cell.value
-    
+
+    merge_map = build_merge_map(ws)
+
     calc = data['calculation']
     items = data['items']
-    
+
     from datetime import datetime
     
-    set_cell_value(ws, 'B2', calc.get('invoice_no', ''))
+    set_cell_value(ws, 'B2', calc.get('invoice_no', ''), merge_map)
     
     invoice_date = calc.get('invoice_date', '')
     if invoice_date:
@@ -59,224 +82,276 @@ def export_excel(data):
             formatted_date = invoice_date
     else:
         formatted_date = ''
-    set_cell_value(ws, 'B4', formatted_date)
+    set_cell_value(ws, 'B4', formatted_date, merge_map)
     
-    set_cell_value(ws, 'C2', 'TOTAL VALUE')
-    set_cell_value(ws, 'D2', float(calc.get('total_value', 0)))
-    set_cell_value(ws, 'D4', int(calc.get('total_quantity', 0)))
-    set_cell_value(ws, 'E2', 'TRANSPORT COST')
-    set_cell_value(ws, 'E4', 'INSURANCE COST')
-    set_cell_value(ws, 'G2', 'STORAGE COST')
-    set_cell_value(ws, 'G4', 'CURRENCY -USD/TL-')
-    set_cell_value(ws, 'F2', float(calc.get('transport_cost', 0)))
-    set_cell_value(ws, 'F4', float(calc.get('insurance_cost', 0)))
-    set_cell_value(ws, 'H2', float(calc.get('storage_cost', 0)))
-    set_cell_value(ws, 'H4', float(calc.get('currency_rate', 0)))
+    set_cell_value(ws, 'C2', 'TOTAL VALUE', merge_map)
+    set_cell_value(ws, 'D2', float(calc.get('total_value', 0)), merge_map)
+    set_cell_value(ws, 'D4', int(calc.get('total_quantity', 0)), merge_map)
+    set_cell_value(ws, 'E2', 'TRANSPORT COST', merge_map)
+    set_cell_value(ws, 'E4', 'INSURANCE COST', merge_map)
+    set_cell_value(ws, 'G2', 'STORAGE COST', merge_map)
+    set_cell_value(ws, 'G4', 'CURRENCY -USD/TL-', merge_map)
+    set_cell_value(ws, 'F2', float(calc.get('transport_cost', 0)), merge_map)
+    set_cell_value(ws, 'F4', float(calc.get('insurance_cost', 0)), merge_map)
+    set_cell_value(ws, 'H2', float(calc.get('storage_cost', 0)), merge_map)
+    set_cell_value(ws, 'H4', float(calc.get('currency_rate', 0)), merge_map)
     
-    total_customs_tax = sum(float(item.get('customs_tax', 0)) for item in items)
-    total_add_customs_tax = sum(float(item.get('additional_customs_tax', 0)) for item in items)
-    total_kkdf = sum(float(item.get('kkdf', 0)) for item in items)
-    total_vat = sum(float(item.get('vat', 0)) for item in items)
-    total_tax_usd = sum(float(item.get('total_tax_usd', 0)) for item in items)
-    total_tax_tl = sum(float(item.get('total_tax_tl', 0)) for item in items)
+    # Single columnar pass over items: coerce every numeric field exactly
+    # once into per-column lists (SoA layout), accumulate the six totals,
+    # and precompute the derived VAT columns. The write loop further down
+    # then only indexes ready-made floats.
+    n = len(items)
+    col_cost = [0.0] * n
+    col_unit_count = [0] * n
+    col_total_value = [0.0] * n
+    col_transport = [0.0] * n
+    col_insurance = [0.0] * n
+    col_storage = [0.0] * n
+    col_customs_pct = [0.0] * n
+    col_add_customs_pct = [0.0] * n
+    col_kkdf_pct = [0.0] * n
+    col_vat_pct = [0.0] * n
+    col_customs_tax = [0.0] * n
+    col_add_customs_tax = [0.0] * n
+    col_kkdf = [0.0] * n
+    col_vat = [0.0] * n
+    col_tax_usd = [0.0] * n
+    col_vat_base = [0.0] * n
+    col_vat_base_no_kkdf = [0.0] * n
+    col_vat_no_kkdf = [0.0] * n
+
+    total_customs_tax = 0.0
+    total_add_customs_tax = 0.0
+    total_kkdf = 0.0
+    total_vat = 0.0
+    total_tax_usd = 0.0
+    total_tax_tl = 0.0
+    for i, item in enumerate(items):
+        col_cost[i] = float(item.get('cost', 0))
+        col_unit_count[i] = int(item.get('unit_count', 0))
+        col_total_value[i] = float(item.get('total_value', 0))
+        col_transport[i] = float(item.get('transport_share', 0))
+        col_insurance[i] = float(item.get('insurance_share', 0))
+        col_storage[i] = float(item.get('storage_share', 0))
+
+        hs_code_data = item.get('hs_code_data')
+        if hs_code_data:
+            col_customs_pct[i] = float(hs_code_data.get('customs_tax_percent', 0))
+            col_add_customs_pct[i] = float(hs_code_data.get('additional_customs_tax_percent', 0))
+            col_kkdf_pct[i] = float(hs_code_data.get('kkdf_percent', 0))
+            col_vat_pct[i] = float(hs_code_data.get('vat_percent', 0))
+
+        col_customs_tax[i] = float(item.get('customs_tax', 0))
+        col_add_customs_tax[i] = float(item.get('additional_customs_tax', 0))
+        col_kkdf[i] = float(item.get('kkdf', 0))
+        col_vat[i] = float(item.get('vat', 0))
+        col_tax_usd[i] = float(item.get('total_tax_usd', 0))
+        col_vat_base[i] = float(item.get('vat_base', 0))
+        col_vat_base_no_kkdf[i] = col_vat_base[i] - col_kkdf[i]
+        col_vat_no_kkdf[i] = col_vat_base_no_kkdf[i] * col_vat_pct[i]
+
+        total_customs_tax += col_customs_tax[i]
+        total_add_customs_tax += col_add_customs_tax[i]
+        total_kkdf += col_kkdf[i]
+        total_vat += col_vat[i]
+        total_tax_usd += col_tax_usd[i]
+        total_tax_tl += float(item.get('total_tax_tl', 0))
     
-    set_cell_value(ws, 'A6', 'TOTAL CUSTOMS TAX')
-    set_cell_value(ws, 'B6', 'TOTAL ADD. CUSTOMS TAX')
-    set_cell_value(ws, 'C6', 'TOTAL KKDF')
-    set_cell_value(ws, 'D6', 'TOTAL VAT (KKDF INCLUDED)')
-    set_cell_value(ws, 'E6', 'TOTAL VAT (KKDF EXCLUDED)')
-    set_cell_value(ws, 'F6', 'TOTAL TAX (KKDF INCLUDED)')
-    set_cell_value(ws, 'G6', 'TOTAL TAX (KKDF EXCLUDED)')
-    set_cell_value(ws, 'H6', 'TOTAL TAX TURKISH LIRA')
+    set_cell_value(ws, 'A6', 'TOTAL CUSTOMS TAX', merge_map)
+    set_cell_value(ws, 'B6', 'TOTAL ADD. CUSTOMS TAX', merge_map)
+    set_cell_value(ws, 'C6', 'TOTAL KKDF', merge_map)
+    set_cell_value(ws, 'D6', 'TOTAL VAT (KKDF INCLUDED)', merge_map)
+    set_cell_value(ws, 'E6', 'TOTAL VAT (KKDF EXCLUDED)', merge_map)
+    set_cell_value(ws, 'F6', 'TOTAL TAX (KKDF INCLUDED)', merge_map)
+    set_cell_value(ws, 'G6', 'TOTAL TAX (KKDF EXCLUDED)', merge_map)
+    set_cell_value(ws, 'H6', 'TOTAL TAX TURKISH LIRA', merge_map)
     
-    set_cell_value(ws, 'A7', total_customs_tax)
-    set_cell_value(ws, 'B7', total_add_customs_tax)
-    set_cell_value(ws, 'C7', total_kkdf)
-    set_cell_value(ws, 'D7', total_vat + total_kkdf)
-    set_cell_value(ws, 'E7', total_vat)
-    set_cell_value(ws, 'F7', total_tax_usd)
-    set_cell_value(ws, 'G7', total_tax_usd - total_kkdf)
-    set_cell_value(ws, 'H7', total_tax_tl)
+    set_cell_value(ws, 'A7', total_customs_tax, merge_map)
+    set_cell_value(ws, 'B7', total_add_customs_tax, merge_map)
+    set_cell_value(ws, 'C7', total_kkdf, merge_map)
+    set_cell_value(ws, 'D7', total_vat + total_kkdf, merge_map)
+    set_cell_value(ws, 'E7', total_vat, merge_map)
+    set_cell_value(ws, 'F7', total_tax_usd, merge_map)
+    set_cell_value(ws, 'G7', total_tax_usd - total_kkdf, merge_map)
+    set_cell_value(ws, 'H7', total_tax_tl, merge_map)
     
-    set_cell_value(ws, 'A9', 'HTS Codes')
-    set_cell_value(ws, 'B9', 'Country of Origin')
-    set_cell_value(ws, 'C9', 'Style')
-    set_cell_value(ws, 'D9', 'Color')
-    set_cell_value(ws, 'E9', 'Category')
-    set_cell_value(ws, 'F9', 'Description')
-    set_cell_value(ws, 'G9', 'Fabric Content')
-    set_cell_value(ws, 'H9', 'Cost')
-    set_cell_value(ws, 'I9', 'Unit')
-    set_cell_value(ws, 'J9', 'Total Value')
-    set_cell_value(ws, 'K9', 'TR HS CODE')
-    set_cell_value(ws, 'L9', 'EX REGISTRY FORM')
-    set_cell_value(ws, 'M9', 'AZO DYE TEST')
-    set_cell_value(ws, 'N9', 'SPECIAL CUSTOMS')
-    set_cell_value(ws, 'O9', 'TRANSPORT')
-    set_cell_value(ws, 'P9', 'INSURANCE')
-    set_cell_value(ws, 'Q9', 'STORAGE')
-    set_cell_value(ws, 'R9', 'CUSTOMS TAX %')
-    set_cell_value(ws, 'S9', 'ADDITIONAL CUSTOMS TAX %')
-    set_cell_value(ws, 'T9', 'KKDF %')
-    set_cell_value(ws, 'U9', 'VAT %')
-    set_cell_value(ws, 'V9', 'TOTAL CUSTOMS TAX')
-    set_cell_value(ws, 'W9', 'TOTAL ADDT CUSTOMS TAX')
-    set_cell_value(ws, 'X9', 'KKDF VALUE')
-    set_cell_value(ws, 'Y9', 'VAT BASE WITH KKDF')
-    set_cell_value(ws, 'Z9', 'VAT BASE WITHOUT KKDF')
-    set_cell_value(ws, 'AA9', 'VAT VALUE WITH KKDF')
-    set_cell_value(ws, 'AB9', 'VAT VALUE WITHOUT KKDF')
-    set_cell_value(ws, 'AC9', 'TOTAL TAX WITH KKDF')
-    set_cell_value(ws, 'AD9', 'TOTAL TAX WITHOUT KKDF')
+    set_cell_value(ws, 'A9', 'HTS Codes', merge_map)
+    set_cell_value(ws, 'B9', 'Country of Origin', merge_map)
+    set_cell_value(ws, 'C9', 'Style', merge_map)
+    set_cell_value(ws, 'D9', 'Color', merge_map)
+    set_cell_value(ws, 'E9', 'Category', merge_map)
+    set_cell_value(ws, 'F9', 'Description', merge_map)
+    set_cell_value(ws, 'G9', 'Fabric Content', merge_map)
+    set_cell_value(ws, 'H9', 'Cost', merge_map)
+    set_cell_value(ws, 'I9', 'Unit', merge_map)
+    set_cell_value(ws, 'J9', 'Total Value', merge_map)
+    set_cell_value(ws, 'K9', 'TR HS CODE', merge_map)
+    set_cell_value(ws, 'L9', 'EX REGISTRY FORM', merge_map)
+    set_cell_value(ws, 'M9', 'AZO DYE TEST', merge_map)
+    set_cell_value(ws, 'N9', 'SPECIAL CUSTOMS', merge_map)
+    set_cell_value(ws, 'O9', 'TRANSPORT', merge_map)
+    set_cell_value(ws, 'P9', 'INSURANCE', merge_map)
+    set_cell_value(ws, 'Q9', 'STORAGE', merge_map)
+    set_cell_value(ws, 'R9', 'CUSTOMS TAX %', merge_map)
+    set_cell_value(ws, 'S9', 'ADDITIONAL CUSTOMS TAX %', merge_map)
+    set_cell_value(ws, 'T9', 'KKDF %', merge_map)
+    set_cell_value(ws, 'U9', 'VAT %', merge_map)
+    set_cell_value(ws, 'V9', 'TOTAL CUSTOMS TAX', merge_map)
+    set_cell_value(ws, 'W9', 'TOTAL ADDT CUSTOMS TAX', merge_map)
+    set_cell_value(ws, 'X9', 'KKDF VALUE', merge_map)
+    set_cell_value(ws, 'Y9', 'VAT BASE WITH KKDF', merge_map)
+    set_cell_value(ws, 'Z9', 'VAT BASE WITHOUT KKDF', merge_map)
+    set_cell_value(ws, 'AA9', 'VAT VALUE WITH KKDF', merge_map)
+    set_cell_value(ws, 'AB9', 'VAT VALUE WITHOUT KKDF', merge_map)
+    set_cell_value(ws, 'AC9', 'TOTAL TAX WITH KKDF', merge_map)
+    set_cell_value(ws, 'AD9', 'TOTAL TAX WITHOUT KKDF', merge_map)
     
     template_row = 10
     last_data_row = 10 + len(items) - 1
+
+    # Snapshot the template row's style objects once (copy() unwraps the
+    # StyleProxy into a real style object). openpyxl treats these as
+    # immutable and dedupes them on save, so sharing the same references
+    # across every cloned row is safe and skips the per-cell copy.copy
+    # calls. The template fill is not captured: every data cell gets the
+    # row-parity band fill instead.
+    template_styles = {}
+    for col in range(1, 31):
+        template_cell = ws.cell(template_row, col)
+        if template_cell.has_style:
+            template_styles[col] = (
+                copy(template_cell.font),
+                copy(template_cell.border),
+                template_cell.number_format,
+                copy(template_cell.protection),
+                copy(template_cell.alignment),
+            )
+
+    # Two shared fill objects for the banded rows, hoisted out of the loop
+    # so N rows reuse them instead of allocating 2N PatternFills.
+    gray_fill = PatternFill(start_color='FFD3D3D3', end_color='FFD3D3D3', fill_type='solid')
+    white_fill = PatternFill(start_color='FFFFFFFF', end_color='FFFFFFFF', fill_type='solid')
+
+    # Merged ranges that sit entirely on the template row, captured once so
+    # the per-item loop never has to rescan ws.merged_cells.ranges.
+    template_merges = [
+        (mr.min_col, mr.max_col)
+        for mr in ws.merged_cells.ranges
+        if mr.min_row == template_row and mr.max_row == template_row
+    ]
     
+    # Rows are written append-style at 10 + index: the template area below
+    # row 10 is blank (and gets scrubbed further down anyway), so there is
+    # no need for ws.insert_rows, which re-shuffles the whole cell dict and
+    # every merged range on each call. Rows past the template row only need
+    # its styling cloned onto them.
     for index, item in enumerate(items):
         row_num = 10 + index
-        
+
+        # One walk per row handles both the template-style clone and the
+        # row-parity band fill.
+        band_fill = gray_fill if index % 2 == 0 else white_fill
         if index > 0:
-            ws.insert_rows(row_num)
-            
             for col in range(1, 31):
-                template_cell = ws.cell(template_row, col)
                 new_cell = ws.cell(row_num, col)
-                
-                if template_cell.has_style:
-                    new_cell.font = copy(template_cell.font)
-                    new_cell.border = copy(template_cell.border)
-                    new_cell.fill = copy(template_cell.fill)
-                    new_cell.number_format = copy(template_cell.number_format)
-                    new_cell.protection = copy(template_cell.protection)
-                    new_cell.alignment = copy(template_cell.alignment)
-            
+                styles = template_styles.get(col)
+                if styles:
+                    new_cell.font = styles[0]
+                    new_cell.border = styles[1]
+                    new_cell.number_format = styles[2]
+                    new_cell.protection = styles[3]
+                    new_cell.alignment = styles[4]
+                new_cell.fill = band_fill
+
             ws.row_dimensions[row_num].height = ws.row_dimensions[template_row].height
-            
-            from openpyxl.worksheet.cell_range import CellRange
-            for merged_range in list(ws.merged_cells.ranges):
-                if merged_range.min_row == template_row and merged_range.max_row == template_row:
-                    new_range = CellRange(
-                        min_col=merged_range.min_col,
-                        min_row=row_num,
-                        max_col=merged_range.max_col,
-                        max_row=row_num
-                    )
-                    ws.merge_cells(str(new_range))
-        
-        requirements = item.get('requirements', '')
-        has_ex_registry = 'EX REGISTRY FORM' in requirements
-        has_azo_dye = 'AZO DYE TEST' in requirements
-        has_special = 'SPECIAL CUSTOM' in requirements
-        
-        from openpyxl.utils import get_column_letter
-        
-        set_cell_value(ws, f'A{row_num}', item.get('hts_code', ''))
-        set_cell_value(ws, f'B{row_num}', item.get('country_of_origin', ''))
-        set_cell_value(ws, f'C{row_num}', item.get('style', ''))
-        set_cell_value(ws, f'D{row_num}', item.get('color', ''))
-        set_cell_value(ws, f'E{row_num}', item.get('category', ''))
-        set_cell_value(ws, f'F{row_num}', item.get('description', ''))
-        set_cell_value(ws, f'G{row_num}', item.get('fabric_content', ''))
-        set_cell_value(ws, f'H{row_num}', float(item.get('cost', 0)))
-        set_cell_value(ws, f'I{row_num}', int(item.get('unit_count', 0)))
-        set_cell_value(ws, f'J{row_num}', float(item.get('total_value', 0)))
-        set_cell_value(ws, f'K{row_num}', item.get('tr_hs_code', ''))
-        set_cell_value(ws, f'L{row_num}', 'X' if has_ex_registry else '')
-        set_cell_value(ws, f'M{row_num}', 'X' if has_azo_dye else '')
-        set_cell_value(ws, f'N{row_num}', 'X' if has_special else '')
-        set_cell_value(ws, f'O{row_num}', float(item.get('transport_share', 0)))
-        set_cell_value(ws, f'P{row_num}', float(item.get('insurance_share', 0)))
-        set_cell_value(ws, f'Q{row_num}', float(item.get('storage_share', 0)))
-        
-        hs_code_data = item.get('hs_code_data')
-        if hs_code_data:
-            set_cell_value(ws, f'R{row_num}', float(hs_code_data.get('customs_tax_percent', 0)))
-            set_cell_value(ws, f'S{row_num}', float(hs_code_data.get('additional_customs_tax_percent', 0)))
-            set_cell_value(ws, f'T{row_num}', float(hs_code_data.get('kkdf_percent', 0)))
-            set_cell_value(ws, f'U{row_num}', float(hs_code_data.get('vat_percent', 0)))
-        else:
-            set_cell_value(ws, f'R{row_num}', 0)
-            set_cell_value(ws, f'S{row_num}', 0)
-            set_cell_value(ws, f'T{row_num}', 0)
-            set_cell_value(ws, f'U{row_num}', 0)
-        
-        item_customs_tax = float(item.get('customs_tax', 0))
-        item_add_customs_tax = float(item.get('additional_customs_tax', 0))
-        item_kkdf = float(item.get('kkdf', 0))
-        item_vat = float(item.get('vat', 0))
-        item_total_tax_usd = float(item.get('total_tax_usd', 0))
-        
-        vat_base_with_kkdf = float(item.get('vat_base', 0))
-        vat_base_without_kkdf = vat_base_with_kkdf - item_kkdf
-        
-        vat_percent = float(hs_code_data.get('vat_percent', 0)) if hs_code_data else 0
-        vat_without_kkdf = vat_base_without_kkdf * vat_percent
-        
-        set_cell_value(ws, f'V{row_num}', item_customs_tax)
-        set_cell_value(ws, f'W{row_num}', item_add_customs_tax)
-        set_cell_value(ws, f'X{row_num}', item_kkdf)
-        set_cell_value(ws, f'Y{row_num}', vat_base_with_kkdf)
-        set_cell_value(ws, f'Z{row_num}', vat_base_without_kkdf)
-        set_cell_value(ws, f'AA{row_num}', item_vat)
-        set_cell_value(ws, f'AB{row_num}', vat_without_kkdf)
-        set_cell_value(ws, f'AC{row_num}', item_total_tax_usd)
-        set_cell_value(ws, f'AD{row_num}', item_total_tax_usd - item_kkdf)
-        
-        gray_fill = PatternFill(start_color='FFD3D3D3', end_color='FFD3D3D3', fill_type='solid')
-        white_fill = PatternFill(start_color='FFFFFFFF', end_color='FFFFFFFF', fill_type='solid')
-        
-        if index % 2 == 0:
-            for col in range(1, 31):
-                cell = ws.cell(row_num, col)
-                cell.fill = gray_fill
         else:
             for col in range(1, 31):
-                cell = ws.cell(row_num, col)
-                cell.fill = white_fill
-    
+                ws.cell(row_num, col).fill = band_fill
+
+        # Requirements arrive as a comma-separated string built by
+        # tax-calculation-service.ts; parse it into a set once so each flag
+        # is a hash lookup instead of a substring scan.
+        requirements = item.get('requirements') or ''
+        req_set = {part.strip().upper() for part in requirements.replace(';', ',').split(',')}
+        has_ex_registry = 'EX REGISTRY FORM' in req_set
+        has_azo_dye = 'AZO DYE TEST' in req_set
+        # Legacy rows may say SPECIAL CUSTOMS (see routes.ts), match both.
+        has_special = bool(SPECIAL_CUSTOM_TOKENS & req_set)
+        
+        # Columns A..AD by number: f-string refs cost a regex coordinate
+        # parse per write, which adds up at 30 writes per row.
+        set_cell(ws, row_num, 1, item.get('hts_code', ''), merge_map)
+        set_cell(ws, row_num, 2, item.get('country_of_origin', ''), merge_map)
+        set_cell(ws, row_num, 3, item.get('style', ''), merge_map)
+        set_cell(ws, row_num, 4, item.get('color', ''), merge_map)
+        set_cell(ws, row_num, 5, item.get('category', ''), merge_map)
+        set_cell(ws, row_num, 6, item.get('description', ''), merge_map)
+        set_cell(ws, row_num, 7, item.get('fabric_content', ''), merge_map)
+        set_cell(ws, row_num, 8, col_cost[index], merge_map)
+        set_cell(ws, row_num, 9, col_unit_count[index], merge_map)
+        set_cell(ws, row_num, 10, col_total_value[index], merge_map)
+        set_cell(ws, row_num, 11, item.get('tr_hs_code', ''), merge_map)
+        set_cell(ws, row_num, 12, 'X' if has_ex_registry else '', merge_map)
+        set_cell(ws, row_num, 13, 'X' if has_azo_dye else '', merge_map)
+        set_cell(ws, row_num, 14, 'X' if has_special else '', merge_map)
+        set_cell(ws, row_num, 15, col_transport[index], merge_map)
+        set_cell(ws, row_num, 16, col_insurance[index], merge_map)
+        set_cell(ws, row_num, 17, col_storage[index], merge_map)
+        set_cell(ws, row_num, 18, col_customs_pct[index], merge_map)
+        set_cell(ws, row_num, 19, col_add_customs_pct[index], merge_map)
+        set_cell(ws, row_num, 20, col_kkdf_pct[index], merge_map)
+        set_cell(ws, row_num, 21, col_vat_pct[index], merge_map)
+        set_cell(ws, row_num, 22, col_customs_tax[index], merge_map)
+        set_cell(ws, row_num, 23, col_add_customs_tax[index], merge_map)
+        set_cell(ws, row_num, 24, col_kkdf[index], merge_map)
+        set_cell(ws, row_num, 25, col_vat_base[index], merge_map)
+        set_cell(ws, row_num, 26, col_vat_base_no_kkdf[index], merge_map)
+        set_cell(ws, row_num, 27, col_vat[index], merge_map)
+        set_cell(ws, row_num, 28, col_vat_no_kkdf[index], merge_map)
+        set_cell(ws, row_num, 29, col_tax_usd[index], merge_map)
+        set_cell(ws, row_num, 30, col_tax_usd[index] - col_kkdf[index], merge_map)
+
+    # Replicate the template row's merges onto every cloned row in one
+    # bulk pass rather than per item inside the write loop, and register
+    # the new ranges in merge_map so any subsequent writes into them
+    # resolve to the top-left cell without scanning ws.merged_cells.
+    if template_merges:
+        for row_num in range(template_row + 1, last_data_row + 1):
+            for min_col, max_col in template_merges:
+                ws.merge_cells(start_row=row_num, start_column=min_col,
+                               end_row=row_num, end_column=max_col)
+                for col in range(min_col, max_col + 1):
+                    merge_map[(row_num, col)] = (row_num, min_col)
+
     white_side = Side(style='thin', color='FFFFFFFF')
     white_border = Border(left=white_side, right=white_side, top=white_side, bottom=white_side)
     dxf = DifferentialStyle(border=white_border)
-    
-    # Range 1: A{last_data_row+1}:AD6000 (main data area below last row)
+
+    # Padding regions around the data. These used to be scrubbed by walking
+    # every coordinate with iter_rows (~300K cell touches per export, which
+    # also materialized all those cells). Only cells that actually exist in
+    # the sheet can carry stray values or styling, so scrub just those; the
+    # conditional-formatting rules below handle the appearance of the rest.
     start_row = last_data_row + 1
-    fill_range_1 = f"A{start_row}:AD6000"
-    
-    for row in ws.iter_rows(min_row=start_row, max_row=min(ws.max_row, 6000), min_col=1, max_col=30):
-        for cell in row:
-            cell.border = Border()
-            cell.fill = PatternFill(fill_type=None)
-            if cell.value:
-                cell.value = None
-    
-    rule_1 = Rule(type='expression', dxf=dxf, stopIfTrue=False, formula=['TRUE'])
-    ws.conditional_formatting.add(fill_range_1, rule_1)
-    
-    # Range 2: AC1:BZ7 (top header area in extra columns)
-    fill_range_2 = "AC1:BZ7"
-    
-    for row in ws.iter_rows(min_row=1, max_row=7, min_col=29, max_col=78):
-        for cell in row:
-            cell.border = Border()
-            cell.fill = PatternFill(fill_type=None)
-            if cell.value:
-                cell.value = None
-    
-    rule_2 = Rule(type='expression', dxf=dxf, stopIfTrue=False, formula=['TRUE'])
-    ws.conditional_formatting.add(fill_range_2, rule_2)
-    
-    # Range 3: AE1:BZ6000 (large range in extra columns)
-    fill_range_3 = "AE1:BZ6000"
-    
-    for row in ws.iter_rows(min_row=1, max_row=min(ws.max_row, 6000), min_col=31, max_col=78):
-        for cell in row:
-            cell.border = Border()
-            cell.fill = PatternFill(fill_type=None)
-            if cell.value:
-                cell.value = None
-    
-    rule_3 = Rule(type='expression', dxf=dxf, stopIfTrue=False, formula=['TRUE'])
-    ws.conditional_formatting.add(fill_range_3, rule_3)
+    regions = [
+        (start_row, 6000, 1, 30),   # A{start_row}:AD6000 below the data
+        (1, 7, 29, 78),             # AC1:BZ7 top header area, extra columns
+        (1, 6000, 31, 78),          # AE1:BZ6000 extra columns
+    ]
+    no_border = Border()
+    no_fill = PatternFill(fill_type=None)
+    for (r, c), cell in list(ws._cells.items()):
+        for min_row, max_row, min_col, max_col in regions:
+            if min_row <= r <= max_row and min_col <= c <= max_col:
+                cell.border = no_border
+                cell.fill = no_fill
+                if cell.value:
+                    cell.value = None
+                break
+
+    for fill_range in (f"A{start_row}:AD6000", "AC1:BZ7", "AE1:BZ6000"):
+        rule = Rule(type='expression', dxf=dxf, stopIfTrue=False, formula=['TRUE'])
+        ws.conditional_formatting.add(fill_range, rule)
     
     output_path = f"/tmp/tax_calculation_{calc.get('reference', 'export')}.xlsx"
     wb.save(output_path)
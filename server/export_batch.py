@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Run many Excel exports in parallel across a process pool.
+
+Instead of spawning one short-lived Python subprocess per export (paying
+interpreter startup and template parse each time), feed this script a JSON
+array of jobs on stdin:
+
+    [{"type": "tax_calculation", "data": {...}},
+     {"type": "beyanname", "data": {...}}]
+
+"data" is the same payload each exporter already takes on stdin. Output
+paths are printed one per line, in input order.
+"""
+import sys
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from excel_export import export_excel
+from excel_beyanname_export import export_beyanname_excel
+
+EXPORTERS = {
+    'tax_calculation': export_excel,
+    'beyanname': export_beyanname_excel,
+}
+
+
+def run_job(job):
+    exporter = EXPORTERS.get(job.get('type'))
+    if exporter is None:
+        raise ValueError(f"Unknown export type: {job.get('type')!r}")
+    return exporter(job['data'])
+
+
+def main():
+    jobs = json.loads(sys.stdin.read())
+    # Each worker process keeps its own cached template bytes, so a batch
+    # pays the disk read once per worker rather than once per job.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for path in ex.map(run_job, jobs):
+            print(path)
+
+
+if __name__ == '__main__':
+    main()